@@ -8,45 +8,138 @@ from src.backend.PluginManager.PluginBase import PluginBase
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
 
 # Import python modules
 import os
 import json
+import functools
 import threading
+import logging
+import time
+from concurrent.futures import Future
 from typing import Optional
-import sys
 
-# Add parent directory to path for imports
-plugin_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, plugin_dir)
+# The plugin root is put on sys.path by actions/__init__.py
+from backend.homebridge_client import get_shared_client
+from backend.executor import HOMEBRIDGE_EXECUTOR
+from backend.poller import get_poller
 
-from backend.homebridge_client import HomebridgeClient
+logger = logging.getLogger(__name__)
+
+# At most one brightness write is sent to Homebridge per window
+THROTTLE_SECONDS = 0.2
+
+# Delay after the last config edit before settings are written
+SETTINGS_FLUSH_SECONDS = 0.4
 
 
 class BrightnessControl(ActionBase):
     HAS_CONFIGURATION = True
     
+    # Per-instance state. ActionBase keeps its __dict__, which framework
+    # attributes and cached_property still use.
+    __slots__ = (
+        "homebridge_client", "light_accessory", "brightness", "increment",
+        "_icon_paths", "_last_rendered", "_settings_cache", "_settings_flush_timer",
+        "_subscription", "_ready",
+        "_pending_brightness", "_debounce_timer", "_debounce_lock", "_inflight",
+        "_last_put_time", "_last_put_value", "_put_lock",
+    )
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.homebridge_client = None
         self.light_accessory = None
         self.brightness = 50
         self.increment = 10
+        self._icon_paths = {}
+        self._last_rendered = None
+        self._settings_cache: Optional[dict] = None
+        self._settings_flush_timer: Optional[threading.Timer] = None
+        self._subscription = None  # (poller, accessory_uuid)
+        self._ready = False
+        
+        # Throttle state - rapid presses update the target immediately, the
+        # first press is sent right away and later ones are coalesced into one
+        # trailing write per window
+        self._pending_brightness = self.brightness
+        self._debounce_timer: Optional[threading.Timer] = None
+        self._debounce_lock = threading.Lock()
+        self._inflight: Optional[Future] = None
+        self._last_put_time = 0.0
+        self._last_put_value: Optional[int] = None
+        # Keeps writes in order if a trailing write starts before the leading one finished
+        self._put_lock = threading.Lock()
         
+    @functools.cached_property
+    def assets_dir(self) -> str:
+        """Directory holding the plugin's icons"""
+        return os.path.join(self.plugin_base.PATH, "assets")
+    
+    def _settings(self) -> dict:
+        """Return the cached settings, loading them on first use"""
+        if self._settings_cache is None:
+            self._settings_cache = self.get_settings() or {}
+        return self._settings_cache
+    
+    def _save(self, settings: dict) -> None:
+        """Update the cached settings and persist them"""
+        self._settings_cache = settings
+        self.set_settings(settings)
+        self._update_ready()
+    
+    def _save_later(self, settings: dict) -> None:
+        """Update the cached settings and persist them once edits settle"""
+        self._settings_cache = settings
+        self._update_ready()
+        
+        if self._settings_flush_timer is not None:
+            self._settings_flush_timer.cancel()
+        # Write from the GTK main loop like the undebounced path did
+        self._settings_flush_timer = threading.Timer(
+            SETTINGS_FLUSH_SECONDS, lambda: GLib.idle_add(self._flush_settings)
+        )
+        self._settings_flush_timer.daemon = True
+        self._settings_flush_timer.start()
+    
+    def _update_ready(self) -> None:
+        """Recompute whether a key press has everything it needs"""
+        self._ready = bool(self.homebridge_client and self._settings().get("accessory_uuid"))
+    
+    def _flush_settings(self) -> None:
+        """Write pending settings changes immediately"""
+        if self._settings_flush_timer is None:
+            return
+        self._settings_flush_timer.cancel()
+        self._settings_flush_timer = None
+        self.set_settings(self._settings_cache)
+    
+    def on_removed_from_cache(self) -> None:
+        """Flush pending settings and stop polling when the action goes away"""
+        self._flush_settings()
+        self._unsubscribe()
+    
     def on_ready(self) -> None:
         """Initialize the action when the plugin is ready"""
-        # Load settings
-        settings = self.get_settings()
+        # Load settings - the only place they are read from disk
+        self._settings_cache = self.get_settings() or {}
+        settings = self._settings_cache
+        self._update_ready()
         
         if settings:
             self.increment = settings.get("increment", 10)
             self.brightness = settings.get("initial_brightness", 50)
+            self._pending_brightness = self.brightness
+        
+        # Resolve icons once, keeping only the ones that exist
+        icon_path = os.path.join(self.assets_dir, "brightness.png")
+        self._icon_paths = {"brightness": icon_path} if os.path.exists(icon_path) else {}
         
         # Set default icon
-        icon_path = os.path.join(self.plugin_base.PATH, "assets", "brightness.png")
-        if os.path.exists(icon_path):
-            self.set_media(media_path=icon_path, size=0.75)
+        self._last_rendered = None
+        if "brightness" in self._icon_paths:
+            self.set_media(media_path=self._icon_paths["brightness"], size=0.75)
         else:
             self.set_label(text="Brightness", position="center")
         
@@ -57,21 +150,55 @@ class BrightnessControl(ActionBase):
     
     def on_key_down(self) -> None:
         """Increase brightness when key is pressed"""
-        if not self.homebridge_client:
+        if not self._ready:
             self.show_error(duration=2)
             return
         
-        # Run in separate thread to avoid blocking
-        threading.Thread(target=self._increase_brightness, daemon=True).start()
+        self._increase_brightness()
     
     def on_key_up(self) -> None:
         """Optional: handle key release"""
         pass
     
     def _increase_brightness(self) -> None:
-        """Increase the brightness"""
+        """Bump the target brightness and schedule a throttled write"""
+        self._pending_brightness = min(100, self._pending_brightness + self.increment)
+        self.brightness = self._pending_brightness
+        
+        # Show the new value right away, Homebridge catches up within one window
+        self._update_display()
+        
+        with self._debounce_lock:
+            if self._debounce_timer is not None and self._debounce_timer.is_alive():
+                # A trailing write is already armed and will send the latest value
+                return
+            
+            wait = self._last_put_time + THROTTLE_SECONDS - time.monotonic()
+            if wait <= 0:
+                # Leading edge - nothing was sent recently, send now
+                self._queue_flush()
+            else:
+                self._debounce_timer = threading.Timer(wait, self._submit_flush)
+                self._debounce_timer.daemon = True
+                self._debounce_timer.start()
+    
+    def _submit_flush(self) -> None:
+        """Send the trailing write once the throttle window closes (runs on the timer thread)"""
+        with self._debounce_lock:
+            self._queue_flush()
+    
+    def _queue_flush(self) -> None:
+        """Queue a brightness write, replacing one that has not started yet (lock must be held)"""
+        if self._inflight is not None:
+            # The queued write would read the same pending value anyway
+            self._inflight.cancel()
+        self._last_put_time = time.monotonic()
+        self._inflight = HOMEBRIDGE_EXECUTOR.submit(self._flush_brightness)
+    
+    def _flush_brightness(self) -> None:
+        """Send the pending brightness to Homebridge"""
         try:
-            settings = self.get_settings()
+            settings = self._settings()
             if not settings or not self.homebridge_client:
                 return
             
@@ -79,32 +206,75 @@ class BrightnessControl(ActionBase):
             if not accessory_uuid:
                 return
             
-            # Get current brightness
-            status = self.homebridge_client.get_light_status(accessory_uuid)
-            if status and "brightness" in status:
-                current_brightness = status["brightness"]
-            else:
-                current_brightness = self.brightness
-            
-            # Increase brightness
-            self.brightness = min(100, current_brightness + self.increment)
-            
-            # Set brightness via Homebridge
-            success = self.homebridge_client.set_brightness(accessory_uuid, self.brightness)
+            with self._put_lock:
+                brightness = self._pending_brightness
+                if brightness == self._last_put_value:
+                    return
+                
+                # Skip the On=true write when the light is already on - some
+                # Homebridge plugins race an On write against the Brightness
+                # write and end up at a random level
+                status = get_poller(self.homebridge_client).get_state(accessory_uuid)
+                if status and status.get("on"):
+                    success = self.homebridge_client.set_brightness_only(accessory_uuid, brightness)
+                else:
+                    success = self.homebridge_client.set_brightness(accessory_uuid, brightness)
+                if success:
+                    self._last_put_value = brightness
             
             if success:
-                self._update_display()
+                self._subscribe()
+                get_poller(self.homebridge_client).request_refresh()
             else:
                 self.show_error(duration=3)
             
         except Exception as e:
-            print(f"Error increasing brightness: {e}")
+            logger.error("Error increasing brightness: %s", e)
             self.show_error(duration=3)
     
+    def _subscribe(self) -> None:
+        """Follow the configured light on the shared background poller"""
+        accessory_uuid = self._settings().get("accessory_uuid")
+        subscription = None
+        if self.homebridge_client and accessory_uuid:
+            subscription = (get_poller(self.homebridge_client), accessory_uuid)
+        
+        if subscription == self._subscription:
+            return
+        
+        self._unsubscribe()
+        if subscription:
+            poller, accessory_uuid = subscription
+            poller.subscribe(accessory_uuid, self._on_state_update)
+            self._subscription = subscription
+    
+    def _unsubscribe(self) -> None:
+        """Stop following the light on the background poller"""
+        if self._subscription is not None:
+            poller, accessory_uuid = self._subscription
+            poller.unsubscribe(accessory_uuid, self._on_state_update)
+            self._subscription = None
+    
+    def _on_state_update(self, status: dict) -> None:
+        """Handle a state change pushed by the background poller"""
+        with self._debounce_lock:
+            # Don't let a poll overwrite a brightness that is still being sent
+            if self._debounce_timer is not None and self._debounce_timer.is_alive():
+                return
+            if self._inflight is not None and not self._inflight.done():
+                return
+        
+        if "brightness" in status:
+            self.brightness = status["brightness"]
+            self._pending_brightness = self.brightness
+            # Homebridge now holds this value, whatever was last written
+            self._last_put_value = self.brightness
+            GLib.idle_add(self._update_display)
+    
     def _update_state_from_homebridge(self) -> None:
-        """Update display based on current light state from Homebridge"""
+        """Update display from the last state polled from Homebridge (no network I/O)"""
         try:
-            settings = self.get_settings()
+            settings = self._settings()
             if not settings or not self.homebridge_client:
                 return
             
@@ -112,50 +282,87 @@ class BrightnessControl(ActionBase):
             if not accessory_uuid:
                 return
             
-            # Get current state from Homebridge
-            status = self.homebridge_client.get_light_status(accessory_uuid)
+            self._subscribe()
+            status = get_poller(self.homebridge_client).get_state(accessory_uuid)
             
             if status and "brightness" in status:
                 self.brightness = status["brightness"]
-                self._update_display()
+                self._pending_brightness = self.brightness
+                self._last_put_value = self.brightness
+                GLib.idle_add(self._update_display)
         
         except Exception as e:
-            print(f"Error updating state from Homebridge: {e}")
+            logger.error("Error updating state from Homebridge: %s", e)
     
     def _update_display(self) -> None:
         """Update the display with current brightness"""
-        assets_dir = os.path.join(self.plugin_base.PATH, "assets")
-        icon_path = os.path.join(assets_dir, "brightness.png")
+        # Skip re-encoding the key image when nothing changed
+        key = (self.brightness,)
+        if key == self._last_rendered:
+            return
         
-        if os.path.exists(icon_path):
+        icon_path = self._icon_paths.get("brightness")
+        if icon_path:
             self.set_media(media_path=icon_path, size=0.75)
         
         self.set_bottom_label(text=f"{self.brightness}%")
+        self._last_rendered = key
     
     def initialize_homebridge_connection(self) -> None:
-        """Initialize connection to Homebridge"""
-        settings = self.get_settings()
+        """Initialize connection to Homebridge without waiting on the network"""
+        self._build_client()
+        self._verify_client_async()
+    
+    def _build_client(self) -> None:
+        """Create the Homebridge client from settings (no network I/O)"""
+        settings = self._settings()
         if not settings:
             return
         
+        host = settings.get("homebridge_host", "http://localhost:8581")
+        pin = settings.get("homebridge_pin")
+        
+        self.homebridge_client = get_shared_client(host, pin)
+        self._update_ready()
+        self._subscribe()
+    
+    def _verify_client_async(self) -> None:
+        """Test the connection on the worker pool; callers use the client optimistically"""
+        if self.homebridge_client is not None:
+            HOMEBRIDGE_EXECUTOR.submit(self._verify_client, self.homebridge_client)
+    
+    def _verify_client(self, client, refresh: bool = False) -> bool:
+        """
+        Test a client, dropping it and showing an error if it cannot connect
+        
+        Args:
+            client: HomebridgeClient to test
+            refresh: Fetch from Homebridge instead of accepting a cached accessory list
+        """
         try:
-            host = settings.get("homebridge_host", "http://localhost:8581")
-            pin = settings.get("homebridge_pin")
-            
-            self.homebridge_client = HomebridgeClient(host, pin)
-            
-            # Test connection
-            if not self.homebridge_client.test_connection():
-                print("Failed to connect to Homebridge server")
+            # The cached path lets tiles starting together share one download
+            if refresh:
+                connected = client.refresh_accessories() is not None
+            else:
+                connected = client.get_accessories() is not None
+        except Exception as e:
+            logger.error("Error initializing Homebridge connection: %s", e)
+            connected = False
+        
+        if not connected:
+            logger.error("Failed to connect to Homebridge server")
+            # Settings may have replaced the client while the test was running
+            if self.homebridge_client is client:
                 self.homebridge_client = None
+                self._update_ready()
+                self._subscribe()
+            GLib.idle_add(self.show_error, 2)
         
-        except Exception as e:
-            print(f"Error initializing Homebridge connection: {e}")
-            self.homebridge_client = None
+        return connected
     
     def get_config_rows(self):
         """Return configuration rows for the action"""
-        settings = self.get_settings()
+        settings = self._settings()
         
         preferences_group = Adw.PreferencesGroup()
         
@@ -240,49 +447,56 @@ class BrightnessControl(ActionBase):
     
     def _on_host_changed(self, widget, param) -> None:
         """Handle host change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["homebridge_host"] = widget.get_text()
-        self.set_settings(settings)
         self.homebridge_client = None  # Reset connection
+        self._subscribe()  # Stop polling the old server
+        self._save_later(settings)
     
     def _on_pin_changed(self, widget, param) -> None:
         """Handle PIN change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["homebridge_pin"] = widget.get_text()
-        self.set_settings(settings)
         self.homebridge_client = None  # Reset connection
+        self._subscribe()  # Stop polling the old server
+        self._save_later(settings)
     
     def _on_accessory_changed(self, widget, param) -> None:
         """Handle accessory change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["accessory_uuid"] = widget.get_text()
-        self.set_settings(settings)
+        self._save_later(settings)
+        
+        # Follow the new light on the poller (builds the client if unconfigured)
+        if self.homebridge_client is None:
+            self._build_client()
+        self._subscribe()
     
     def _on_increment_changed(self, widget, param) -> None:
         """Handle increment change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         self.increment = int(widget.get_value())
         settings["increment"] = self.increment
-        self.set_settings(settings)
+        self._save_later(settings)
     
     def _on_test_connection(self, button) -> None:
         """Test connection to Homebridge"""
-        settings = self.get_settings()
+        settings = self._settings()
         if not settings:
             self.show_error(duration=2)
             return
         
-        # Reset and reinitialize connection
+        # Reset and rebuild the connection, then test it off the UI thread
         self.homebridge_client = None
-        self.initialize_homebridge_connection()
+        self._build_client()
         
         if self.homebridge_client:
-            # Try to get accessories
-            accessories = self.homebridge_client.get_accessories()
-            if accessories:
-                print("Successfully connected to Homebridge")
-            else:
-                print("Connected but could not retrieve accessories")
+            HOMEBRIDGE_EXECUTOR.submit(self._test_connection, self.homebridge_client)
         else:
-            print("Failed to connect to Homebridge")
+            logger.error("Failed to connect to Homebridge")
+    
+    def _test_connection(self, client) -> None:
+        """Verify a client against the live server (runs on the worker pool)"""
+        if self._verify_client(client, refresh=True):
+            logger.info("Successfully connected to Homebridge")
 
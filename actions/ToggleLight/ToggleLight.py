@@ -8,40 +8,122 @@ from src.backend.PluginManager.PluginBase import PluginBase
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Adw", "1")
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib, Gio
 
 # Import python modules
 import os
 import json
+import functools
 import threading
-import asyncio
+import logging
 from typing import Optional
-import sys
 
-# Add parent directory to path for imports
-plugin_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.insert(0, plugin_dir)
+# The plugin root is put on sys.path by actions/__init__.py
+from backend.homebridge_client import get_shared_client
+from backend.executor import HOMEBRIDGE_EXECUTOR
+from backend.poller import get_poller
 
-from backend.homebridge_client import HomebridgeClient
+logger = logging.getLogger(__name__)
+
+# Service/characteristic types that can be switched on and off
+_LIGHT_TYPES = frozenset({"On", "Switch", "Lightbulb", "Outlet", "Dimmer"})
+
+# Delay after the last config edit before settings are written
+SETTINGS_FLUSH_SECONDS = 0.4
 
 
 class ToggleLight(ActionBase):
     HAS_CONFIGURATION = True
     
+    # Per-instance state. ActionBase keeps its __dict__, which framework
+    # attributes and cached_property still use.
+    __slots__ = (
+        "homebridge_client", "is_on",
+        "_icon_paths", "_last_rendered", "_settings_cache", "_settings_flush_timer",
+        "_subscription", "_ready",
+        "_available_lights", "_light_dropdown", "_light_model",
+    )
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.homebridge_client = None
         self.is_on = False
-        
+        self._icon_paths = {}
+        self._last_rendered = None
+        self._settings_cache: Optional[dict] = None
+        self._settings_flush_timer: Optional[threading.Timer] = None
+        self._subscription = None  # (poller, accessory_uuid)
+        self._ready = False
+        
+    @functools.cached_property
+    def assets_dir(self) -> str:
+        """Directory holding the plugin's icons"""
+        return os.path.join(self.plugin_base.PATH, "assets")
+    
+    def _settings(self) -> dict:
+        """Return the cached settings, loading them on first use"""
+        if self._settings_cache is None:
+            self._settings_cache = self.get_settings() or {}
+        return self._settings_cache
+    
+    def _save(self, settings: dict) -> None:
+        """Update the cached settings and persist them"""
+        self._settings_cache = settings
+        self.set_settings(settings)
+        self._update_ready()
+    
+    def _save_later(self, settings: dict) -> None:
+        """Update the cached settings and persist them once edits settle"""
+        self._settings_cache = settings
+        self._update_ready()
+        
+        if self._settings_flush_timer is not None:
+            self._settings_flush_timer.cancel()
+        # Write from the GTK main loop like the undebounced path did
+        self._settings_flush_timer = threading.Timer(
+            SETTINGS_FLUSH_SECONDS, lambda: GLib.idle_add(self._flush_settings)
+        )
+        self._settings_flush_timer.daemon = True
+        self._settings_flush_timer.start()
+    
+    def _update_ready(self) -> None:
+        """Recompute whether a key press has everything it needs"""
+        self._ready = bool(self.homebridge_client and self._settings().get("accessory_uuid"))
+    
+    def _flush_settings(self) -> None:
+        """Write pending settings changes immediately"""
+        if self._settings_flush_timer is None:
+            return
+        self._settings_flush_timer.cancel()
+        self._settings_flush_timer = None
+        self.set_settings(self._settings_cache)
+    
+    def on_removed_from_cache(self) -> None:
+        """Flush pending settings and stop polling when the action goes away"""
+        self._flush_settings()
+        self._unsubscribe()
+    
     def on_ready(self) -> None:
         """Initialize the action when the plugin is ready"""
-        # Load settings
-        settings = self.get_settings()
+        # Load settings - the only place they are read from disk
+        self._settings_cache = self.get_settings() or {}
+        settings = self._settings_cache
+        self._update_ready()
+        
+        # Resolve icons once, keeping only the ones that exist
+        self._icon_paths = {
+            name: path
+            for name, path in (
+                ("on", os.path.join(self.assets_dir, "light-on.png")),
+                ("off", os.path.join(self.assets_dir, "light-off.png")),
+            )
+            if os.path.exists(path)
+        }
         
         # Set default icon
-        icon_path = os.path.join(self.plugin_base.PATH, "assets", "light-off.png")
-        if os.path.exists(icon_path):
-            self.set_media(media_path=icon_path, size=0.75)
+        self._last_rendered = None
+        if "off" in self._icon_paths:
+            self.set_media(media_path=self._icon_paths["off"], size=0.75)
         else:
             self.set_label(text="", position="center")
         
@@ -53,28 +135,22 @@ class ToggleLight(ActionBase):
     
     def on_key_down(self) -> None:
         """Toggle the light when the key is pressed"""
-        settings = self.get_settings()
-        
-        # Check if we have required configuration
-        if not settings or "accessory_uuid" not in settings:
-            self.show_error(duration=2)
-            return
-        
-        # Ensure client is initialized
-        if not self.homebridge_client:
-            self.initialize_homebridge_connection()
-        
-        if not self.homebridge_client:
-            self.show_error(duration=2)
-            return
+        if not self._ready:
+            # Connect now if a light is configured but the client is missing
+            if self._settings().get("accessory_uuid"):
+                self.initialize_homebridge_connection()
+            
+            if not self._ready:
+                self.show_error(duration=2)
+                return
         
-        # Run in separate thread to avoid blocking
-        threading.Thread(target=self._toggle_light, daemon=True).start()
+        # Run on the worker pool to avoid blocking
+        HOMEBRIDGE_EXECUTOR.submit(self._toggle_light)
     
     def _toggle_light(self) -> None:
         """Toggle the light state"""
         try:
-            settings = self.get_settings()
+            settings = self._settings()
             if not settings:
                 return
             
@@ -86,19 +162,49 @@ class ToggleLight(ActionBase):
             success = self.homebridge_client.toggle_light(accessory_uuid)
             
             if success:
-                # Get updated state
-                self._update_state_from_homebridge()
+                # The poller picks up the new state and updates the display
+                self._subscribe()
+                get_poller(self.homebridge_client).request_refresh()
             else:
                 self.show_error(duration=3)
             
         except Exception as e:
-            logger.error(f"Error toggling light: {e}", exc_info=True)
+            logger.error("Error toggling light: %s", e, exc_info=True)
             self.show_error(duration=3)
     
+    def _subscribe(self) -> None:
+        """Follow the configured light on the shared background poller"""
+        accessory_uuid = self._settings().get("accessory_uuid")
+        subscription = None
+        if self.homebridge_client and accessory_uuid:
+            subscription = (get_poller(self.homebridge_client), accessory_uuid)
+        
+        if subscription == self._subscription:
+            return
+        
+        self._unsubscribe()
+        if subscription:
+            poller, accessory_uuid = subscription
+            poller.subscribe(accessory_uuid, self._on_state_update)
+            self._subscription = subscription
+    
+    def _unsubscribe(self) -> None:
+        """Stop following the light on the background poller"""
+        if self._subscription is not None:
+            poller, accessory_uuid = self._subscription
+            poller.unsubscribe(accessory_uuid, self._on_state_update)
+            self._subscription = None
+    
+    def _on_state_update(self, status: dict) -> None:
+        """Handle a state change pushed by the background poller"""
+        if "on" in status:
+            self.is_on = status["on"]
+            GLib.idle_add(self._update_display)
+    
     def _update_state_from_homebridge(self) -> None:
-        """Update display based on current light state from Homebridge"""
+        """Update display from the last state polled from Homebridge (no network I/O)"""
         try:
-            settings = self.get_settings()
+            settings = self._settings()
             if not settings or not self.homebridge_client:
                 return
             
@@ -106,57 +212,91 @@ class ToggleLight(ActionBase):
             if not accessory_uuid:
                 return
             
-            # Get current state from Homebridge
-            status = self.homebridge_client.get_light_status(accessory_uuid)
+            self._subscribe()
+            status = get_poller(self.homebridge_client).get_state(accessory_uuid)
             
             if status and "on" in status:
                 self.is_on = status["on"]
-                self._update_display()
+                GLib.idle_add(self._update_display)
         
         except Exception as e:
-            logger.error(f"Error updating state from Homebridge: {e}", exc_info=True)
+            logger.error("Error updating state from Homebridge: %s", e, exc_info=True)
     
     def _update_display(self) -> None:
         """Update the display based on light state"""
-        assets_dir = os.path.join(self.plugin_base.PATH, "assets")
+        # Skip re-encoding the key image when nothing changed
+        key = (self.is_on,)
+        if key == self._last_rendered:
+            return
         
         if self.is_on:
-            icon_path = os.path.join(assets_dir, "light-on.png")
+            icon_path = self._icon_paths.get("on")
             label = "On"
         else:
-            icon_path = os.path.join(assets_dir, "light-off.png")
+            icon_path = self._icon_paths.get("off")
             label = "Off"
         
-        if os.path.exists(icon_path):
+        if icon_path:
             self.set_media(media_path=icon_path, size=0.75)
         
         self.set_bottom_label(text=label)
+        self._last_rendered = key
     
     def initialize_homebridge_connection(self) -> None:
-        """Initialize connection to Homebridge"""
-        settings = self.get_settings()
+        """Initialize connection to Homebridge without waiting on the network"""
+        self._build_client()
+        self._verify_client_async()
+    
+    def _build_client(self) -> None:
+        """Create the Homebridge client from settings (no network I/O)"""
+        settings = self._settings()
         if not settings:
             return
         
+        host = settings.get("homebridge_host", "http://localhost:8581")
+        username = settings.get("homebridge_username", "admin")
+        password = settings.get("homebridge_password", "")
+        
+        self.homebridge_client = get_shared_client(host, username, password)
+        self._update_ready()
+        self._subscribe()
+    
+    def _verify_client_async(self) -> None:
+        """Test the connection on the worker pool; callers use the client optimistically"""
+        if self.homebridge_client is not None:
+            HOMEBRIDGE_EXECUTOR.submit(self._verify_client, self.homebridge_client)
+    
+    def _verify_client(self, client) -> bool:
+        """Test a client, dropping it and showing an error if it cannot connect"""
         try:
-            host = settings.get("homebridge_host", "http://localhost:8581")
-            username = settings.get("homebridge_username", "admin")
-            password = settings.get("homebridge_password", "")
-            
-            self.homebridge_client = HomebridgeClient(host, username, password)
-            
-            # Test connection
-            if not self.homebridge_client.test_connection():
-                logger.error("Failed to connect to Homebridge server")
+            # Goes through the shared accessory cache, so tiles starting
+            # together cost one download instead of one each
+            connected = client.get_accessories() is not None
+        except Exception as e:
+            logger.error("Error initializing Homebridge connection: %s", e)
+            connected = False
+        
+        if not connected:
+            logger.error("Failed to connect to Homebridge server")
+            # Settings may have replaced the client while the test was running
+            if self.homebridge_client is client:
                 self.homebridge_client = None
+                self._update_ready()
+                self._subscribe()
+            GLib.idle_add(self.show_error, 2)
         
-        except Exception as e:
-            logger.error(f"Error initializing Homebridge connection: {e}", exc_info=True)
-            self.homebridge_client = None
+        return connected
+    
+    def _ensure_client(self):
+        """Return the Homebridge client, creating it from settings if needed"""
+        if self.homebridge_client is None:
+            self._build_client()
+        
+        return self.homebridge_client
     
     def get_config_rows(self):
         """Return configuration rows for the action"""
-        settings = self.get_settings()
+        settings = self._settings()
         
         preferences_group = Adw.PreferencesGroup()
         
@@ -209,31 +349,23 @@ class ToggleLight(ActionBase):
         light_group.set_description("Select the light to control")
         
         # Create dropdown for light selection
-        light_model = Gtk.StringList()
+        light_model = Gio.ListStore.new(Gtk.StringObject)
+        light_model.append(Gtk.StringObject.new("Loading…"))
         
-        # Load available lights from Homebridge
-        lights = self._get_available_lights()
-        selected_index = 0
-        current_uuid = settings.get("accessory_uuid") if settings else None
-        
-        for idx, light in enumerate(lights):
-            light_model.append(light['name'])
-            if light['uniqueId'] == current_uuid:
-                selected_index = idx
-        
-        # If no lights found, add placeholder
-        if len(lights) == 0:
-            light_model.append("No lights found - Check connection")
-        
-        light_dropdown = Gtk.DropDown(model=light_model)
-        light_dropdown.set_selected(selected_index)
+        light_dropdown = Gtk.DropDown(
+            model=light_model,
+            expression=Gtk.PropertyExpression.new(Gtk.StringObject, None, "string")
+        )
         light_dropdown.connect("notify::selected", self._on_light_selected)
         
         # Store references for refresh button
-        self._available_lights = lights
+        self._available_lights = []
         self._light_dropdown = light_dropdown
         self._light_model = light_model
         
+        # Load available lights from Homebridge without blocking the UI
+        HOMEBRIDGE_EXECUTOR.submit(self._load_lights)
+        
         light_row = Adw.ActionRow()
         light_row.set_title("Light")
         light_row.add_suffix(light_dropdown)
@@ -243,51 +375,78 @@ class ToggleLight(ActionBase):
         
         return [preferences_group]
     
-    def _get_available_lights(self) -> list:
-        """Fetch available lights from Homebridge"""
+    def _load_lights(self) -> None:
+        """Fetch lights on the worker pool and hand them to the main loop"""
+        lights = self._get_available_lights()
+        GLib.idle_add(self._populate_light_model, lights)
+    
+    def _populate_light_model(self, lights: list) -> bool:
+        """Fill the light dropdown (must run on the GTK main loop)"""
+        settings = self._settings()
+        current_uuid = settings.get("accessory_uuid") if settings else None
+        selected_index = 0
+        
+        for idx, light in enumerate(lights):
+            if light['uniqueId'] == current_uuid:
+                selected_index = idx
+                break
+        
+        # Replace the whole model in one splice (a single items-changed signal),
+        # showing a placeholder if no lights were found
+        names = [light['name'] for light in lights] or ["No lights found - Check connection"]
+        items = [Gtk.StringObject.new(name) for name in names]
+        self._light_model.splice(0, self._light_model.get_n_items(), items)
+        
+        # Only expose the new list once the model matches it, so selection
+        # changes while repopulating don't overwrite the saved light
+        self._available_lights = lights
+        self._light_dropdown.set_selected(selected_index)
+        return False
+    
+    def _get_available_lights(self, refresh: bool = False) -> list:
+        """
+        Fetch available lights from Homebridge
+        
+        Args:
+            refresh: Bypass the accessory cache (for the Refresh Lights button)
+        """
         accessories = []
         
         try:
-            settings = self.get_settings()
-            if not settings:
+            client = self._ensure_client()
+            if not client:
                 return accessories
             
-            host = settings.get("homebridge_host", "http://localhost:8581")
-            username = settings.get("homebridge_username", "admin")
-            password = settings.get("homebridge_password", "")
-            
-            client = HomebridgeClient(host, username, password, timeout=15)
-            
             # Get all accessories/characteristics
-            all_items = client.get_accessories()
+            if refresh:
+                all_items = client.refresh_accessories(timeout=15, force=True)
+            else:
+                all_items = client.get_accessories(timeout=15)
             if not all_items:
                 return accessories
             
             # Filter for lights - look for items with controllable types
             # The response is a flat list of characteristics
-            seen_lights = set()
+            # Keyed by uniqueId to avoid duplicates (some lights might have multiple characteristics)
+            by_id = {}
             
             for item in all_items:
+                get = item.get
                 # Check if this is a controllable light/switch device
                 # The flat list shows SERVICE types (Lightbulb, Switch, Outlet, etc.)
-                if item.get("type") in ["On", "Switch", "Lightbulb", "Outlet", "Dimmer"]:
-                    # Use serviceName as the device name
-                    name = item.get("serviceName", "Light")
-                    unique_id = item.get("uniqueId", "")
-                    
-                    # Avoid duplicates (some lights might have multiple characteristics)
-                    if unique_id and unique_id not in seen_lights:
-                        seen_lights.add(unique_id)
-                        accessories.append({
-                            "name": name,
-                            "uniqueId": unique_id,
-                            "aid": item.get("aid"),
-                            "iid": item.get("iid"),
-                            "full": item
-                        })
+                if get("type") in _LIGHT_TYPES and (unique_id := get("uniqueId")) and unique_id not in by_id:
+                    by_id[unique_id] = {
+                        # Use serviceName as the device name
+                        "name": get("serviceName", "Light"),
+                        "uniqueId": unique_id,
+                        "aid": get("aid"),
+                        "iid": get("iid"),
+                    }
+            
+            accessories = list(by_id.values())
             
         except Exception as e:
-            logger.error(f"Error fetching lights from Homebridge: {e}", exc_info=True)
+            logger.error("Error fetching lights from Homebridge: %s", e, exc_info=True)
         
         return accessories
     
@@ -297,98 +456,58 @@ class ToggleLight(ActionBase):
         
         if selected_index < len(self._available_lights):
             light = self._available_lights[selected_index]
-            settings = self.get_settings() or {}
+            settings = self._settings()
             settings["accessory_uuid"] = light['uniqueId']
-            self.set_settings(settings)
-            # Don't reset client - it can be reused for different lights
+            self._save(settings)
+            # Don't reset client - it can be reused for different lights,
+            # but follow the newly selected one on the poller
+            self._ensure_client()
+            self._subscribe()
     
     def _on_refresh_lights(self, button) -> None:
         """Refresh the list of lights from Homebridge"""
         button.set_sensitive(False)  # Disable button while fetching
         button.set_label("Refreshing...")
         
-        # Run in thread to avoid blocking UI
-        threading.Thread(target=self._refresh_lights_async, args=(button,), daemon=True).start()
+        # Run on the worker pool to avoid blocking UI
+        HOMEBRIDGE_EXECUTOR.submit(self._refresh_lights_async, button)
     
     def _refresh_lights_async(self, button) -> None:
         """Fetch lights asynchronously and update dropdown"""
+        lights = self._get_available_lights(refresh=True)
+        GLib.idle_add(self._finish_refresh, button, lights)
+    
+    def _finish_refresh(self, button, lights: list) -> bool:
+        """Show refreshed lights and re-enable the button (runs on the GTK main loop)"""
         try:
-            # Fetch fresh list of lights
-            lights = self._get_available_lights()
-            
-            # Update stored references
-            self._available_lights = lights
-            
-            # Clear and repopulate the dropdown model
-            while self._light_model.get_n_items() > 0:
-                self._light_model.remove(0)
-            
-            current_uuid = self.get_settings().get("accessory_uuid") if self.get_settings() else None
-            selected_index = 0
-            
-            if len(lights) > 0:
-                for idx, light in enumerate(lights):
-                    self._light_model.append(light['name'])
-                    if light['uniqueId'] == current_uuid:
-                        selected_index = idx
-                self._light_dropdown.set_selected(selected_index)
-            else:
-                self._light_model.append("No lights found")
-                self._light_dropdown.set_selected(0)
-            
-            button.set_label("Refresh Lights")
-            button.set_sensitive(True)
-            
+            self._populate_light_model(lights)
         except Exception as e:
-            logger.error(f"Error refreshing lights: {e}", exc_info=True)
-            button.set_label("Refresh Lights")
-            button.set_sensitive(True)
+            logger.error("Error refreshing lights: %s", e, exc_info=True)
+        
+        button.set_label("Refresh Lights")
+        button.set_sensitive(True)
+        return False
     
     def _on_host_changed(self, widget, param) -> None:
         """Handle host change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["homebridge_host"] = widget.get_text()
-        self.set_settings(settings)
         self.homebridge_client = None  # Reset connection
+        self._subscribe()  # Stop polling the old server
+        self._save_later(settings)
     
     def _on_username_changed(self, widget, param) -> None:
         """Handle username change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["homebridge_username"] = widget.get_text()
-        self.set_settings(settings)
         self.homebridge_client = None  # Reset connection
+        self._subscribe()  # Stop polling the old server
+        self._save_later(settings)
     
     def _on_password_changed(self, widget, param) -> None:
         """Handle password change"""
-        settings = self.get_settings() or {}
+        settings = self._settings()
         settings["homebridge_password"] = widget.get_text()
-        self.set_settings(settings)
         self.homebridge_client = None  # Reset connection
-    
-    def _on_accessory_changed(self, widget, param) -> None:
-        """Handle accessory change"""
-        settings = self.get_settings() or {}
-        settings["accessory_uuid"] = widget.get_text()
-        self.set_settings(settings)
-    
-    def _on_test_connection(self, button) -> None:
-        """Test connection to Homebridge"""
-        settings = self.get_settings()
-        if not settings:
-            self.show_error(duration=2)
-            return
-        
-        # Reset and reinitialize connection
-        self.homebridge_client = None
-        self.initialize_homebridge_connection()
-        
-        if self.homebridge_client:
-            # Try to get accessories
-            accessories = self.homebridge_client.get_accessories()
-            if accessories:
-                logger.info("Successfully connected to Homebridge")
-            else:
-                logger.warning("Connected but could not retrieve accessories")
-        else:
-            logger.error("Failed to connect to Homebridge")
-
+        self._subscribe()  # Stop polling the old server
+        self._save_later(settings)
@@ -0,0 +1,8 @@
+# Make the plugin root importable so actions can use `from backend... import ...`.
+# Runs once when the actions package is first imported.
+import os
+import sys
+
+_plugin_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _plugin_dir not in sys.path:
+    sys.path.insert(0, _plugin_dir)
@@ -1,6 +1,9 @@
 """HomeBridge Plugin Backend Module"""
 
-from .homebridge_client import HomebridgeClient
+from .homebridge_client import HomebridgeClient, get_shared_client
+from .cache import TTLCache
+from .executor import HOMEBRIDGE_EXECUTOR
+from .poller import BackgroundPoller, get_poller
 from .config_helper import HomebridgeConfigHelper, AccessoryListModel
 
-__all__ = ["HomebridgeClient", "HomebridgeConfigHelper", "AccessoryListModel"]
+__all__ = ["HomebridgeClient", "get_shared_client", "HomebridgeConfigHelper", "AccessoryListModel", "TTLCache", "HOMEBRIDGE_EXECUTOR", "BackgroundPoller", "get_poller"]
@@ -0,0 +1,105 @@
+"""
+TTL Cache Module
+
+This module provides a small in-process cache with stale-while-revalidate
+semantics for Homebridge API responses.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """Thread-safe TTL cache that serves stale values while refreshing in the background"""
+
+    def __init__(self, fresh_ttl: float, stale_ttl: float):
+        """
+        Initialize TTL cache
+
+        Args:
+            fresh_ttl: Seconds a value is served without refreshing
+            stale_ttl: Seconds a value may still be served while a background refresh runs
+        """
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = max(stale_ttl, fresh_ttl)
+        # {key: (value, fresh_until, stale_until)}
+        self._entries: Dict[Hashable, Tuple[Any, float, float]] = {}
+        self._refreshing: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Get a value, loading or refreshing it as needed
+
+        Fresh hits return immediately. Stale hits return the cached value and
+        refresh it on a daemon thread. Misses call the loader synchronously.
+        None results are never cached.
+
+        Args:
+            key: Cache key
+            loader: Function returning the current value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fresh_until, stale_until = entry
+                if now < fresh_until:
+                    return value
+                if now < stale_until:
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, loader),
+                            daemon=True
+                        ).start()
+                    return value
+
+        value = loader()
+        self.put(key, value)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value (None is ignored)
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        if value is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + self.fresh_ttl, now + self.stale_ttl)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Drop a single entry, or every entry if no key is given
+
+        Args:
+            key: Cache key to drop
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        """Reload a stale entry in the background"""
+        try:
+            self.put(key, loader())
+        except Exception as e:
+            logger.error(f"Error refreshing cache entry {key}: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
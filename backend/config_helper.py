@@ -6,12 +6,26 @@ and discovering available accessories.
 """
 
 import threading
-from typing import Optional, List, Dict, Any, Callable
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, Tuple
 from .homebridge_client import HomebridgeClient
 import logging
 
 logger = logging.getLogger(__name__)
 
+# HAP Lightbulb service type as reported by Homebridge (name, legacy id, full UUID)
+_LIGHT_SERVICE_TYPES = frozenset({
+    "Lightbulb",
+    "public.hap.service.lightbulb",
+    "00000043-0000-1000-8000-0026BB765291",
+})
+# Short/lowercase forms of the Lightbulb UUID all start with this
+_LIGHT_UUID_PREFIX = "00000043"
+
+# Reused worker threads for background discovery
+_DISCOVERY_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hb-discover")
+
 
 class HomebridgeConfigHelper:
     """Helper class for Homebridge configuration and device discovery"""
@@ -28,7 +42,11 @@ class HomebridgeConfigHelper:
         self.pin = pin
         self.client = None
         self._accessories_cache = None
-        self._discovery_thread = None
+        self._accessories_cache_ts = 0.0
+        self._light_names_cache = None
+        self._force_refresh = False
+        self._discovery_future: Optional[Future] = None
+        self._discovery_lock = threading.Lock()
     
     def set_credentials(self, host: str, pin: str = None) -> None:
         """
@@ -41,7 +59,18 @@ class HomebridgeConfigHelper:
         self.host = host
         self.pin = pin
         self.client = None
+        self.invalidate()
+    
+    def invalidate(self) -> None:
+        """Forget discovered accessories so the next discovery queries Homebridge"""
+        # Don't let later callers join a discovery started before this point
+        with self._discovery_lock:
+            self._discovery_future = None
         self._accessories_cache = None
+        self._accessories_cache_ts = 0.0
+        self._light_names_cache = None
+        # The next discovery downloads the full list instead of a conditional GET
+        self._force_refresh = True
     
     def get_client(self) -> Optional[HomebridgeClient]:
         """
@@ -66,25 +95,34 @@ class HomebridgeConfigHelper:
             return False
         return client.test_connection()
     
-    def discover_accessories(self, callback: Optional[Callable] = None) -> Optional[List[Dict[str, Any]]]:
+    def discover_accessories(self, callback: Optional[Callable] = None,
+                             max_age: float = 30.0) -> Optional[List[Dict[str, Any]]]:
         """
         Discover available accessories from Homebridge
         
         Args:
             callback: Optional callback function to call when discovery is complete
                      Callback will receive a list of accessories or None
+            max_age: Seconds a previous discovery result is reused without querying Homebridge
         
         Returns:
             List of accessories or None if discovery fails (or runs in background if callback provided)
         """
+        accessories = self._accessories_cache
+        if accessories and time.monotonic() - self._accessories_cache_ts < max_age:
+            if callback:
+                callback(accessories)
+                return None
+            return accessories
+        
         if callback:
-            # Run discovery in background thread
-            self._discovery_thread = threading.Thread(
-                target=self._discover_accessories_thread,
-                args=(callback,),
-                daemon=True
-            )
-            self._discovery_thread.start()
+            # Join a discovery that is already running instead of starting another
+            with self._discovery_lock:
+                future = self._discovery_future
+                if future is None or future.done():
+                    future = _DISCOVERY_POOL.submit(self._discover_accessories_sync)
+                    self._discovery_future = future
+            future.add_done_callback(lambda f: self._deliver_discovery(f, callback))
             return None
         else:
             # Run discovery synchronously
@@ -96,7 +134,10 @@ class HomebridgeConfigHelper:
         if not client:
             return None
         
-        accessories = client.get_accessories()
+        # This helper caches discovery itself (see max_age), so bypass the
+        # client's accessory cache rather than serve its older list
+        force, self._force_refresh = self._force_refresh, False
+        accessories = client.refresh_accessories(force=force)
         
         if accessories:
             # Filter to only lightbulb accessories
@@ -104,19 +145,25 @@ class HomebridgeConfigHelper:
                 acc for acc in accessories
                 if self._is_light_accessory(acc)
             ]
+            if self.client is not client:
+                # Credentials changed while this discovery ran
+                return light_accessories
             self._accessories_cache = light_accessories
+            self._accessories_cache_ts = time.monotonic()
+            self._light_names_cache = None
             return light_accessories
         
         return None
     
-    def _discover_accessories_thread(self, callback: Callable) -> None:
-        """Discover accessories in a background thread"""
+    @staticmethod
+    def _deliver_discovery(future: Future, callback: Callable) -> None:
+        """Pass the result of a background discovery to a callback"""
         try:
-            accessories = self._discover_accessories_sync()
-            callback(accessories)
+            accessories = future.result()
         except Exception as e:
             logger.error(f"Error during accessory discovery: {e}")
-            callback(None)
+            accessories = None
+        callback(accessories)
     
     def get_cached_accessories(self) -> Optional[List[Dict[str, Any]]]:
         """
@@ -139,15 +186,19 @@ class HomebridgeConfigHelper:
         if not accessories:
             return None
         
-        names = {}
-        for acc in accessories:
-            uuid = acc.get("uuid")
-            name = acc.get("name", "Unknown")
+        # Built once per discovery; reset whenever _accessories_cache changes
+        if self._light_names_cache is None:
+            names = {}
+            for acc in accessories:
+                uuid = acc.get("uuid")
+                name = acc.get("name", "Unknown")
+                
+                if uuid:
+                    names[uuid] = name
             
-            if uuid:
-                names[uuid] = name
+            self._light_names_cache = names
         
-        return names if names else None
+        return self._light_names_cache or None
     
     @staticmethod
     def _is_light_accessory(accessory: Dict[str, Any]) -> bool:
@@ -160,26 +211,29 @@ class HomebridgeConfigHelper:
         Returns:
             True if accessory is a light, False otherwise
         """
-        try:
-            # Check if has services
-            services = accessory.get("services", [])
-            
-            for service in services:
-                service_type = service.get("type", "")
-                # Look for standard light service types
-                if "Lightbulb" in service_type or "000000043" in service_type:
-                    return True
-            
-            # Check accessory type
-            accessory_type = accessory.get("type", "").lower()
-            if "light" in accessory_type:
+        services = accessory.get("services") or ()
+        
+        for service in services:
+            service_type = service.get("type") or ""
+            # Look for standard light service types
+            if service_type in _LIGHT_SERVICE_TYPES or service_type.startswith(_LIGHT_UUID_PREFIX):
                 return True
-            
-            return False
-            
-        except Exception as e:
-            logger.warning(f"Error checking if accessory is light: {e}")
-            return False
+        
+        # Check accessory type
+        accessory_type = (accessory.get("type") or "").lower()
+        return "light" in accessory_type
+
+
+def _project_accessory(acc: Dict[str, Any]) -> Dict[str, str]:
+    """Reduce a discovered accessory to the fields AccessoryListModel exposes"""
+    get = acc.get
+    return {
+        "uuid": get("uuid", ""),
+        "name": get("name", "Unknown"),
+        "manufacturer": get("manufacturer", ""),
+        "model": get("model", ""),
+        "serial_number": get("serial_number", "")
+    }
 
 
 class AccessoryListModel:
@@ -194,7 +248,10 @@ class AccessoryListModel:
         """
         self.config_helper = config_helper
         self.accessories = []
-        self.listeners = []
+        self._by_uuid = {}
+        # Copy-on-write: replaced (never mutated) under the lock, read without it
+        self._listeners: Tuple[Callable, ...] = ()
+        self._listeners_lock = threading.Lock()
     
     def add_listener(self, callback: Callable) -> None:
         """
@@ -203,11 +260,13 @@ class AccessoryListModel:
         Args:
             callback: Function to call when model changes
         """
-        self.listeners.append(callback)
+        with self._listeners_lock:
+            self._listeners = self._listeners + (callback,)
     
     def notify_listeners(self) -> None:
         """Notify all listeners of model changes"""
-        for listener in self.listeners:
+        listeners = self._listeners
+        for listener in listeners:
             try:
                 listener(self.accessories)
             except Exception as e:
@@ -217,21 +276,15 @@ class AccessoryListModel:
         """Refresh accessory list from Homebridge"""
         def on_discovery_complete(accessories):
             if accessories:
-                self.accessories = [
-                    {
-                        "uuid": acc.get("uuid", ""),
-                        "name": acc.get("name", "Unknown"),
-                        "manufacturer": acc.get("manufacturer", ""),
-                        "model": acc.get("model", ""),
-                        "serial_number": acc.get("serial_number", "")
-                    }
-                    for acc in accessories
-                ]
+                self.accessories = list(map(_project_accessory, accessories))
             else:
                 self.accessories = []
             
+            self._by_uuid = {acc["uuid"]: acc for acc in self.accessories if acc["uuid"]}
             self.notify_listeners()
         
+        # An explicit refresh must not be answered from the discovery cache
+        self.config_helper.invalidate()
         self.config_helper.discover_accessories(callback=on_discovery_complete)
     
     def get_accessories(self) -> List[Dict[str, str]]:
@@ -253,7 +306,4 @@ class AccessoryListModel:
         Returns:
             Accessory dictionary or None
         """
-        for acc in self.accessories:
-            if acc["uuid"] == uuid:
-                return acc
-        return None
+        return self._by_uuid.get(uuid)
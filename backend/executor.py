@@ -0,0 +1,11 @@
+"""
+Worker Pool Module
+
+This module provides the thread pool used to run Homebridge requests off the UI thread.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every action so the number of worker threads stays bounded
+# no matter how fast keys are pressed
+HOMEBRIDGE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hb")
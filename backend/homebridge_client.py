@@ -6,13 +6,163 @@ Based on: https://github.com/sergey-tihon/streamdeck-homebridge
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from typing import Optional, Dict, List, Any
+import hashlib
+import threading
+import time
+import weakref
+from typing import Optional, Dict, List, Any, Tuple
 import logging
 from datetime import datetime, timedelta
+from .cache import TTLCache
+
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    _loads = json.loads
 
 logger = logging.getLogger(__name__)
 
+# Errors a Homebridge request can reasonably raise: transport/HTTP failures,
+# bad URLs and undecodable JSON (orjson/json decode errors are ValueErrors)
+_REQUEST_ERRORS = (requests.RequestException, ValueError)
+
+# Characteristic types used by the light helpers
+CHAR_ON = "On"
+CHAR_SWITCH = "Switch"
+CHAR_BRIGHTNESS = "Brightness"
+_POWER_CHARS = (CHAR_ON, CHAR_SWITCH)
+
+# Clients shared between actions, keyed by (host, credential hash). Held weakly
+# so a client goes away once no action or poller uses it (e.g. after a host edit).
+_shared_clients: "weakref.WeakValueDictionary[Tuple[str, str], HomebridgeClient]" = weakref.WeakValueDictionary()
+_shared_clients_lock = threading.Lock()
+
+
+def get_shared_client(host: str, username: str, password: str = "") -> "HomebridgeClient":
+    """
+    Get a HomebridgeClient shared by every action using the same server and credentials
+    
+    Sharing the client lets all actions reuse one authenticated session and its
+    pooled keep-alive connections instead of reconnecting on every call.
+    
+    Args:
+        host: The Homebridge server URL (e.g., http://localhost:8581)
+        username: Homebridge username (usually 'admin')
+        password: Homebridge password
+    
+    Returns:
+        HomebridgeClient instance
+    """
+    credential_hash = hashlib.sha256(f"{username}\0{password}".encode()).hexdigest()
+    key = (host.rstrip('/'), credential_hash)
+    
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = HomebridgeClient(host, username, password)
+            _shared_clients[key] = client
+        return client
+
+
+def _parse_values_dict(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse a response with a 'values' dict, e.g. {"On": true, "Brightness": 42}"""
+    values = data.get("values", {})
+    
+    # Homebridge UI-X keys values by characteristic type
+    status = {}
+    for char_type in _POWER_CHARS:
+        if char_type in values:
+            status["on"] = values[char_type]
+            break
+    if CHAR_BRIGHTNESS in values:
+        status["brightness"] = values[CHAR_BRIGHTNESS]
+    if status:
+        return status
+    
+    # Otherwise keys are ids like {"1.10": true, "1.9": false, ...}
+    debug = logger.isEnabledFor(logging.DEBUG)
+    for key, value in values.items():
+        if debug:
+            logger.debug("[GET_STATUS]   %s: %s", key, value)
+        # We need to map these back to characteristic types somehow
+        # For now, assume the first boolean is the On/Switch state
+        if isinstance(value, bool):
+            status["on"] = value
+            break
+    return status
+
+
+def _parse_service_chars(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Parse an accessory with nested serviceCharacteristics"""
+    status = {}
+    for char in data.get("serviceCharacteristics", []):
+        char_type = char.get("type")
+        value = char.get("value")
+        
+        if char_type in _POWER_CHARS:
+            status["on"] = value
+        elif char_type == CHAR_BRIGHTNESS:
+            status["brightness"] = value
+    return status
+
+
+def _parse_flat_list(data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse a flat list of characteristics"""
+    status = {}
+    for item in data:
+        if item.get("type") in _POWER_CHARS:
+            status["on"] = item.get("value")
+    return status
+
+
+_SHAPE_PARSERS = {
+    "values_dict": _parse_values_dict,
+    "service_chars": _parse_service_chars,
+    "flat_list": _parse_flat_list,
+}
+
+
+def detect_response_shape(data: Any) -> Optional[str]:
+    """
+    Work out which of the known accessory response layouts data uses
+    
+    Args:
+        data: A decoded Homebridge API response
+    
+    Returns:
+        Key into _SHAPE_PARSERS or None if the layout is unknown
+    """
+    if isinstance(data, dict):
+        # UI-X items carry both; serviceCharacteristics names every value
+        if "serviceCharacteristics" in data:
+            return "service_chars"
+        if "values" in data:
+            return "values_dict"
+    elif isinstance(data, list):
+        return "flat_list"
+    return None
+
+
+def parse_light_status(data: Any, shape: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract on/brightness values from an accessory returned by /api/accessories
+    
+    Args:
+        data: A single accessory (service) from the Homebridge API
+        shape: Layout from detect_response_shape, detected from data if omitted
+    
+    Returns:
+        Dictionary with "on" and/or "brightness" keys (empty if nothing found)
+    """
+    parser = _SHAPE_PARSERS.get(shape or detect_response_shape(data))
+    return parser(data) if parser else {}
+
 
 class HomebridgeClient:
     """Client for interacting with Homebridge API using Bearer token authentication"""
@@ -32,16 +182,48 @@ class HomebridgeClient:
         self.password = password
         self.timeout = timeout
         self.access_token: Optional[str] = None
-        self.token_expires_at: Optional[datetime] = None
+        # ISO timestamp for get_token_status; validity checks use the monotonic deadline
+        self.token_expires_at: Optional[str] = None
+        self._token_expires_monotonic = 0.0
+        
+        # One session per client so TCP/TLS connections are kept alive and reused
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+            "Keep-Alive": "timeout=30, max=100",
+        })
+        # Release pooled sockets when the client is dropped from the shared registry
+        weakref.finalize(self, self.session.close)
+        
+        # Light status changes often, the accessory list rarely
+        self._status_cache = TTLCache(fresh_ttl=3.0, stale_ttl=30.0)
+        self._accessories_cache = TTLCache(fresh_ttl=15.0, stale_ttl=120.0)
+        
+        # Characteristics by uniqueId from the last full fetch, used to read
+        # current state without a per-accessory GET
+        self.state_ttl = 2.0
+        self._state_index: Tuple[float, Dict[str, List[Dict[str, Any]]]] = (0.0, {})
+        # {uniqueId: {characteristic type: position in serviceCharacteristics}}
+        self._char_index: Dict[str, Dict[str, int]] = {}
+        
+        # Layout of each accessory's /api/accessories/{id} response, detected once
+        self._response_shapes: Dict[str, Optional[str]] = {}
+        
+        # (ETag, parsed body) of the last full /api/accessories response, kept
+        # together so a 304 always pairs with the body the ETag describes
+        self._accessories_etag: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+        
+        # (hash, parsed body) of the last /api/accessories response, so an
+        # unchanged list from a server without ETags is not decoded again
+        self._accessories_body: Optional[Tuple[int, List[Dict[str, Any]]]] = None
         
     def _is_token_valid(self) -> bool:
         """Check if current token is still valid"""
-        if not self.access_token or not self.token_expires_at:
-            return False
-        is_valid = datetime.now() < self.token_expires_at
-        time_remaining = (self.token_expires_at - datetime.now()).total_seconds() / 60
-        logger.debug(f"Token valid: {is_valid}, Time remaining: {time_remaining:.1f} mins")
-        return is_valid
+        return bool(self.access_token) and time.monotonic() < self._token_expires_monotonic
     
     def authenticate(self) -> bool:
         """
@@ -50,74 +232,207 @@ class HomebridgeClient:
         Returns:
             True if authentication successful, False otherwise
         """
+        url = f"{self.host}/api/auth/login"
+        body = {
+            "username": self.username,
+            "password": self.password
+        }
+        
+        logger.info(f"Authenticating with Homebridge at {self.host}")
+        
         try:
-            url = f"{self.host}/api/auth/login"
-            body = {
-                "username": self.username,
-                "password": self.password
-            }
-            
-            logger.info(f"Authenticating with Homebridge at {self.host}")
-            
-            response = requests.post(
-                url,
-                json=body,
-                timeout=self.timeout,
-                headers={"Content-Type": "application/json"}
-            )
+            response = self.session.post(url, data=_dumps(body), timeout=self.timeout)
             response.raise_for_status()
-            
-            data = response.json()
-            self.access_token = data.get("access_token")
-            
-            # Calculate when token expires (subtract 10 mins as buffer)
-            expires_in = data.get("expires_in", 3600)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 600)
-            
-            logger.info(f"✓ Token obtained successfully. Expires in {expires_in/3600:.1f} hours at {self.token_expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
-            return bool(self.access_token)
-        except Exception as e:
-            logger.error(f"✗ Authentication failed: {e}")
+            data = _loads(response.content)
+        except _REQUEST_ERRORS as e:
+            logger.error(f"✗ Authentication failed: {e}", exc_info=True)
             self.access_token = None
+            self._set_auth_header()
             return False
+        
+        self.access_token = data.get("access_token")
+        self._set_auth_header()
+        
+        # Calculate when token expires (subtract 10 mins as buffer)
+        expires_in = data.get("expires_in", 3600)
+        self._token_expires_monotonic = time.monotonic() + (expires_in - 600)
+        expires_at = datetime.now() + timedelta(seconds=expires_in - 600)
+        self.token_expires_at = expires_at.isoformat()
+        
+        logger.info(f"✓ Token obtained successfully. Expires in {expires_in/3600:.1f} hours at {expires_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        return bool(self.access_token)
     
-    def _get_headers(self) -> Dict[str, str]:
-        """Get headers with authorization token"""
-        headers = {"Content-Type": "application/json"}
+    def _set_auth_header(self) -> None:
+        """Keep the session's default Authorization header in sync with access_token"""
         if self.access_token:
-            headers["Authorization"] = f"Bearer {self.access_token}"
-        return headers
+            self.session.headers["Authorization"] = f"Bearer {self.access_token}"
+        else:
+            self.session.headers.pop("Authorization", None)
+    
+    def close(self) -> None:
+        """Close the HTTP session and its pooled connections"""
+        self.session.close()
         
-    def get_accessories(self) -> Optional[List[Dict[str, Any]]]:
+    def get_accessories(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
         """
         Get list of all accessories from Homebridge via /api/accessories
         
+        Results are cached; a stale list is returned while it refreshes in the background.
+        
+        Args:
+            timeout: Request timeout in seconds (defaults to the client timeout)
+        
         Returns:
             List of accessories or None if request fails
         """
-        try:
-            # Re-authenticate if token is expired
-            if not self._is_token_valid() and not self.authenticate():
-                logger.debug("[GET_ACC] Failed to authenticate before fetching")
-                return None
-                
-            url = f"{self.host}/api/accessories"
-            headers = self._get_headers()
+        return self._accessories_cache.get("all", lambda: self._fetch_accessories(timeout))
+    
+    def refresh_accessories(self, timeout: Optional[float] = None,
+                            force: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch the accessory list now, bypassing the cache, and store the result
+        
+        Args:
+            timeout: Request timeout in seconds (defaults to the client timeout)
+            force: Drop the ETag and remembered body so the full list is downloaded
+                   (for explicit user refreshes; polling leaves this off)
+        
+        Returns:
+            List of accessories or None if request fails
+        """
+        if force:
+            self._accessories_etag = None
+            self._accessories_body = None
+        data = self._fetch_accessories(timeout)
+        self._accessories_cache.put("all", data)
+        
+        if isinstance(data, list):
+            index = {
+                item["uniqueId"]: item.get("serviceCharacteristics", [])
+                for item in data
+                if isinstance(item, dict) and item.get("uniqueId")
+            }
+            self._state_index = (time.monotonic(), index)
+        
+        return data
+    
+    def _get_cached_state(self, accessory_id: str, char_type: str) -> Any:
+        """
+        Read a characteristic value from the recent accessory list
+        
+        The list is refetched when older than state_ttl or when the accessory's
+        entry was invalidated by a write.
+        
+        Args:
+            accessory_id: The unique ID of the accessory
+            char_type: Characteristic type (e.g., "On")
+        
+        Returns:
+            The characteristic value or None if unknown
+        """
+        timestamp, index = self._state_index
+        if time.monotonic() - timestamp >= self.state_ttl or accessory_id not in index:
+            self.refresh_accessories()
+            timestamp, index = self._state_index
+        
+        chars = index.get(accessory_id)
+        if not chars:
+            return None
+        
+        position = self._char_position(accessory_id, chars, char_type)
+        return chars[position].get("value") if position is not None else None
+    
+    def _update_cached_state(self, accessory_id: str, char_type: str, value: Any) -> None:
+        """
+        Record a successful write in the recent accessory list
+        
+        The characteristic list is copied rather than edited, since the same
+        dicts are shared with the cached accessory list.
+        
+        Args:
+            accessory_id: The unique ID of the accessory
+            char_type: Characteristic type that was written
+            value: Value that was written
+        """
+        index = self._state_index[1]
+        chars = index.get(accessory_id)
+        if not chars:
+            return
+        
+        position = self._char_position(accessory_id, chars, char_type)
+        if position is None:
+            return
+        
+        chars = list(chars)
+        chars[position] = dict(chars[position], value=value)
+        index[accessory_id] = chars
+    
+    def _char_position(self, accessory_id: str, chars: List[Dict[str, Any]], char_type: str) -> Optional[int]:
+        """
+        Find a characteristic's position, indexing the accessory on first use
+        
+        Args:
+            accessory_id: The unique ID of the accessory
+            chars: The accessory's serviceCharacteristics list
+            char_type: Characteristic type (e.g., "On")
+        
+        Returns:
+            Index into chars or None if the accessory has no such characteristic
+        """
+        positions = self._char_index.get(accessory_id)
+        position = positions.get(char_type) if positions is not None else None
+        
+        if position is None or position >= len(chars) or chars[position].get("type") != char_type:
+            # First lookup, or the characteristic layout changed since the last fetch
+            positions = {char.get("type"): i for i, char in enumerate(chars)}
+            self._char_index[accessory_id] = positions
+            position = positions.get(char_type)
+        
+        return position
+    
+    def _fetch_accessories(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """Fetch the accessory list from Homebridge, bypassing the cache"""
+        # Re-authenticate if token is expired
+        if not self._is_token_valid() and not self.authenticate():
+            logger.debug("[GET_ACC] Failed to authenticate before fetching")
+            return None
             
-            logger.debug(f"[GET_ACC] Fetching from {url}")
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+        url = f"{self.host}/api/accessories"
+        
+        # Ask for the body only if it changed since the last full response
+        validator = self._accessories_etag
+        headers = {"If-None-Match": validator[0]} if validator else None
+        
+        logger.debug("[GET_ACC] Fetching from %s", url)
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout or self.timeout)
+            if response.status_code == 304 and validator:
+                logger.debug("[GET_ACC] Not modified")
+                return validator[1]
             response.raise_for_status()
             
-            data = response.json()
-            logger.debug(f"[GET_ACC] Received {len(data) if isinstance(data, list) else '?'} items")
-            if isinstance(data, list) and len(data) > 0:
-                logger.debug(f"[GET_ACC] First item sample: {data[0]}")
-            
-            return data
-            
-        except Exception as e:
-            logger.error(f"[GET_ACC] Error fetching accessories: {e}", exc_info=True)
+            # Return the same list object for an identical body so callers
+            # (the poller) can skip parsing it again
+            body_hash = hash(response.content)
+            previous = self._accessories_body
+            if previous is not None and previous[0] == body_hash:
+                logger.debug("[GET_ACC] Response unchanged")
+                return previous[1]
+            
+            data = _loads(response.content)
+        except _REQUEST_ERRORS as e:
+            logger.error(f"[GET_ACC] Error fetching accessories: {e}")
             return None
+        
+        self._accessories_body = (body_hash, data)
+        etag = response.headers.get("ETag")
+        self._accessories_etag = (etag, data) if etag else None
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[GET_ACC] Received %s items", len(data) if isinstance(data, list) else '?')
+            if isinstance(data, list) and len(data) > 0:
+                logger.debug("[GET_ACC] First item sample: %s", data[0])
+        
+        return data
     
     def set_characteristic(self, accessory_id: str, characteristic_type: str, value: Any) -> bool:
         """
@@ -131,42 +446,43 @@ class HomebridgeClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Re-authenticate if token is expired
-            if not self._is_token_valid() and not self.authenticate():
-                logger.error("Failed to authenticate before setting characteristic")
-                return False
-                
-            url = f"{self.host}/api/accessories/{accessory_id}"
-            headers = self._get_headers()
-            
-            # Convert boolean to 0/1 for JSON serialization
-            # Keep value as int/float, NOT as string - JSON will handle the type
-            if isinstance(value, bool):
-                value_to_send = 1 if value else 0
-            else:
-                value_to_send = value
-            
-            payload = {
-                "characteristicType": characteristic_type,
-                "value": value_to_send
-            }
-            
-            logger.debug(f"Setting {characteristic_type}={value_to_send} for {accessory_id}")
-            
-            response = requests.put(url, json=payload, headers=headers, timeout=self.timeout)
-            
-            if response.status_code >= 400:
-                logger.error(f"Failed to set characteristic: HTTP {response.status_code}")
-                return False
-            
-            response.raise_for_status()
-            logger.debug(f"Successfully set {characteristic_type} for {accessory_id}")
-            return True
+        # Re-authenticate if token is expired
+        if not self._is_token_valid() and not self.authenticate():
+            logger.error("Failed to authenticate before setting characteristic")
+            return False
             
-        except Exception as e:
-            logger.error(f"Error setting characteristic: {e}", exc_info=True)
+        url = f"{self.host}/api/accessories/{accessory_id}"
+        
+        # Convert boolean to 0/1 for JSON serialization
+        # Keep value as int/float, NOT as string - JSON will handle the type
+        if isinstance(value, bool):
+            value_to_send = 1 if value else 0
+        else:
+            value_to_send = value
+        
+        payload = {
+            "characteristicType": characteristic_type,
+            "value": value_to_send
+        }
+        
+        logger.debug("Setting %s=%s for %s", characteristic_type, value_to_send, accessory_id)
+        
+        try:
+            response = self.session.put(url, data=_dumps(payload), timeout=self.timeout)
+        except _REQUEST_ERRORS as e:
+            logger.error(f"Error setting characteristic: {e}")
+            return False
+        
+        if response.status_code >= 400:
+            logger.error(f"Failed to set characteristic: HTTP {response.status_code}")
+            self._char_index.pop(accessory_id, None)
+            self._accessories_etag = None
             return False
+        
+        self._status_cache.invalidate(accessory_id)
+        self._update_cached_state(accessory_id, characteristic_type, value_to_send)
+        logger.debug("Successfully set %s for %s", characteristic_type, accessory_id)
+        return True
     
     def toggle_light(self, accessory_id: str) -> bool:
         """
@@ -178,133 +494,107 @@ class HomebridgeClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Get current state from the individual accessory endpoint
-            url = f"{self.host}/api/accessories/{accessory_id}"
-            
-            # Re-authenticate if needed
-            if not self._is_token_valid() and not self.authenticate():
-                logger.error("Failed to authenticate")
-                return False
-            
-            headers = self._get_headers()
-            response = requests.get(url, headers=headers, timeout=self.timeout)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Parse the response to find current state
-            current_state = None
-            
-            # The official plugin expects serviceCharacteristics array
-            if isinstance(data, dict) and "serviceCharacteristics" in data:
-                chars = data.get("serviceCharacteristics", [])
-                
-                # For dimmers and other devices, look for On characteristic
-                for char in chars:
-                    if char.get("type") in ["On", "Switch"]:
-                        current_state = char.get("value")
-                        break
-            elif isinstance(data, dict) and "values" in data:
-                # Alternative values dict structure
-                values = data.get("values", {})
-                for key, value in values.items():
-                    if isinstance(value, bool):
-                        current_state = value
-                        break
-            elif isinstance(data, list):
-                # Flat list structure - find Switch characteristic
-                for item in data:
-                    if item.get("type") in ["On", "Switch"]:
-                        current_state = item.get("value")
-                        break
-            
-            if current_state is None:
-                logger.error(f"Could not determine current state for accessory {accessory_id}")
-                return False
-            
-            # Convert to boolean if needed
-            if isinstance(current_state, int):
-                current_state = bool(current_state)
-            
-            # Toggle the state
-            new_state = not current_state
-            logger.debug(f"Toggling light {accessory_id}: {current_state} → {new_state}")
-            
-            # Set the new state - ALWAYS use "On" as characteristic type
-            result = self.set_characteristic(accessory_id, "On", new_state)
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error toggling light: {e}", exc_info=True)
+        # Read current state from the recent accessory list instead of a per-accessory GET
+        # (request errors are handled in the fetch/set helpers)
+        for char_type in _POWER_CHARS:
+            current_state = self._get_cached_state(accessory_id, char_type)
+            if current_state is not None:
+                break
+        
+        if current_state is None:
+            logger.error(f"Could not determine current state for accessory {accessory_id}")
             return False
+        
+        # Convert to boolean if needed
+        if isinstance(current_state, int):
+            current_state = bool(current_state)
+        
+        # Toggle the state
+        new_state = not current_state
+        logger.debug("Toggling light %s: %s → %s", accessory_id, current_state, new_state)
+        
+        # Set the new state - ALWAYS use "On" as characteristic type
+        if not self.set_characteristic(accessory_id, CHAR_ON, new_state):
+            return False
+        
+        # Keep the value we read from in step with the write for the next toggle
+        if char_type != CHAR_ON:
+            self._update_cached_state(accessory_id, char_type, int(new_state))
+        return True
+
+    def set_brightness(self, accessory_id: str, brightness: int) -> bool:
+        """
+        Turn a light on and set its brightness
+
+        Args:
+            accessory_id: The unique ID of the light accessory
+            brightness: Brightness level (0-100)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not self.set_characteristic(accessory_id, CHAR_ON, True):
+            return False
+        return self.set_brightness_only(accessory_id, brightness)
     
+    def set_brightness_only(self, accessory_id: str, brightness: int) -> bool:
+        """
+        Set the brightness of a light without touching its power state
+        
+        Use this for lights already known to be on. Writing On and Brightness
+        back to back can race inside Homebridge plugins, and the extra PUT is
+        wasted when the light is on anyway.
+        
+        Args:
+            accessory_id: The unique ID of the light accessory
+            brightness: Brightness level (0-100)
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.set_characteristic(accessory_id, CHAR_BRIGHTNESS, int(brightness))
+
     def get_light_status(self, accessory_id: str) -> Optional[Dict[str, Any]]:
         """
         Get complete status of a light accessory via dedicated endpoint
         
+        Results are cached briefly and invalidated whenever a characteristic is set.
+        
         Args:
             accessory_id: The unique ID of the light accessory
         
         Returns:
             Dictionary with light status or None if request fails
         """
+        return self._status_cache.get(accessory_id, lambda: self._fetch_light_status(accessory_id))
+    
+    def _fetch_light_status(self, accessory_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch the status of a light from Homebridge, bypassing the cache"""
+        # Re-authenticate if token is expired
+        if not self._is_token_valid() and not self.authenticate():
+            return None
+        
+        # Use the individual accessory endpoint to get current values
+        url = f"{self.host}/api/accessories/{accessory_id}"
+        
+        logger.debug("[GET_STATUS] Fetching from %s", url)
         try:
-            # Re-authenticate if token is expired
-            if not self._is_token_valid() and not self.authenticate():
-                return None
-            
-            # Use the individual accessory endpoint to get current values
-            url = f"{self.host}/api/accessories/{accessory_id}"
-            headers = self._get_headers()
-            
-            logger.debug(f"[GET_STATUS] Fetching from {url}")
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            
-            data = response.json()
-            logger.debug(f"[GET_STATUS] Response: {data}")
-            
-            status = {}
-            
-            # The response should have a 'values' array with current characteristic values
-            if isinstance(data, dict):
-                # Check if it has values array
-                if "values" in data:
-                    values = data.get("values", {})
-                    # values is likely a dict: {"1.10": true, "1.9": false, ...}
-                    for key, value in values.items():
-                        logger.debug(f"[GET_STATUS]   {key}: {value}")
-                        # We need to map these back to characteristic types somehow
-                        # For now, assume the first boolean is the On/Switch state
-                        if isinstance(value, bool):
-                            status["on"] = value
-                            break
-                elif "serviceCharacteristics" in data:
-                    # Alternative structure with nested characteristics
-                    for char in data.get("serviceCharacteristics", []):
-                        char_type = char.get("type")
-                        value = char.get("value")
-                        
-                        if char_type in ["On", "Switch"]:
-                            status["on"] = value
-                        elif char_type == "Brightness":
-                            status["brightness"] = value
-                else:
-                    # Flat structure - find On/Switch characteristic
-                    if isinstance(data, list):
-                        for item in data:
-                            char_type = item.get("type")
-                            value = item.get("value")
-                            if char_type in ["On", "Switch"]:
-                                status["on"] = value
-            
-            logger.debug(f"[GET_STATUS] Parsed status: {status}")
-            return status if status else None
-            
-        except Exception as e:
-            logger.error(f"[GET_STATUS] Error getting light status: {e}", exc_info=True)
+            data = _loads(response.content)
+        except _REQUEST_ERRORS as e:
+            logger.error(f"[GET_STATUS] Error getting light status: {e}")
             return None
+        
+        logger.debug("[GET_STATUS] Response: %s", data)
+        
+        shape = self._response_shapes.get(accessory_id)
+        if shape is None:
+            shape = self._response_shapes[accessory_id] = detect_response_shape(data)
+        status = parse_light_status(data, shape) or None
+        
+        logger.debug("[GET_STATUS] Parsed status: %s", status)
+        return status
     
     def get_token_status(self) -> Dict[str, Any]:
         """
@@ -319,13 +609,13 @@ class HomebridgeClient:
         if not self.token_expires_at:
             return {"status": "Token exists but expiration unknown", "authenticated": True}
         
-        time_remaining = (self.token_expires_at - datetime.now()).total_seconds()
+        time_remaining = self._token_expires_monotonic - time.monotonic()
         is_valid = time_remaining > 0
         
         return {
             "authenticated": True,
             "status": "Valid" if is_valid else "Expired",
-            "expires_at": self.token_expires_at.isoformat(),
+            "expires_at": self.token_expires_at,
             "time_remaining_minutes": round(time_remaining / 60, 1)
         }
     
@@ -336,20 +626,18 @@ class HomebridgeClient:
         Returns:
             True if connection successful, False otherwise
         """
+        # Re-authenticate if token is expired
+        if not self._is_token_valid() and not self.authenticate():
+            return False
+        
+        url = f"{self.host}/api/accessories"
+        
         try:
-            # Re-authenticate if token is expired
-            if not self._is_token_valid() and not self.authenticate():
-                return False
-            
-            url = f"{self.host}/api/accessories"
-            headers = self._get_headers()
-            
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
-            
-            return True
-            
-        except Exception as e:
+        except _REQUEST_ERRORS as e:
             logger.error(f"Connection test failed: {e}")
             return False
+        
+        return True
 
@@ -0,0 +1,185 @@
+"""
+Background Poller Module
+
+This module polls Homebridge from a single background thread and pushes light
+state changes to the actions that subscribed to them.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from .homebridge_client import HomebridgeClient, parse_light_status
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of /api/accessories
+POLL_INTERVAL = 5.0
+
+# One poller per shared client, dropped again when its last subscriber leaves
+_pollers: Dict[HomebridgeClient, "BackgroundPoller"] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(client: HomebridgeClient) -> "BackgroundPoller":
+    """
+    Get the poller for a Homebridge client, creating it on first use
+
+    Args:
+        client: HomebridgeClient to poll with (normally from get_shared_client)
+
+    Returns:
+        BackgroundPoller instance
+    """
+    with _pollers_lock:
+        poller = _pollers.get(client)
+        if poller is None:
+            poller = BackgroundPoller(client)
+            _pollers[client] = poller
+        return poller
+
+
+class BackgroundPoller:
+    """Polls all subscribed accessories with one request per interval"""
+
+    def __init__(self, client: HomebridgeClient, interval: float = POLL_INTERVAL):
+        """
+        Initialize background poller
+
+        Args:
+            client: HomebridgeClient used for polling
+            interval: Seconds between polls
+        """
+        self.client = client
+        self.interval = interval
+        self._subscribers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Last accessory list parsed; the client returns the same object while
+        # Homebridge reports no change
+        self._last_accessories: Optional[List[Dict[str, Any]]] = None
+        self._subscribers_changed = False
+
+    def subscribe(self, accessory_id: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Receive state updates for an accessory
+
+        Args:
+            accessory_id: The unique ID of the accessory
+            callback: Called with the new status dict, from the poller thread (or
+                      right away with the current state if it is already known)
+        """
+        with _pollers_lock, self._lock:
+            # Re-register in case the last subscriber left after get_poller()
+            _pollers.setdefault(self.client, self)
+            self._subscribers.setdefault(accessory_id, []).append(callback)
+            self._subscribers_changed = True
+            state = self._states.get(accessory_id)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name="hb-poller",
+                    daemon=True
+                )
+                self._thread.start()
+        
+        # Polls only dispatch changes, so hand a late subscriber the state
+        # other subscribers already have
+        if state is not None:
+            callback(state)
+        self.request_refresh()
+
+    def unsubscribe(self, accessory_id: str, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Stop receiving state updates for an accessory
+
+        Args:
+            accessory_id: The unique ID of the accessory
+            callback: Callback previously passed to subscribe
+        """
+        with _pollers_lock, self._lock:
+            callbacks = self._subscribers.get(accessory_id)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(accessory_id, None)
+                self._states.pop(accessory_id, None)
+            
+            idle = not self._subscribers
+            if idle:
+                # Nobody left - forget this poller so it and its client can be freed
+                if _pollers.get(self.client) is self:
+                    del _pollers[self.client]
+                self._last_accessories = None
+        
+        if idle:
+            # Let the thread exit now instead of after the interval
+            self._wake.set()
+
+    def get_state(self, accessory_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the last polled status of an accessory without any network I/O
+
+        Args:
+            accessory_id: The unique ID of the accessory
+
+        Returns:
+            Status dictionary or None if not polled yet
+        """
+        with self._lock:
+            return self._states.get(accessory_id)
+
+    def request_refresh(self) -> None:
+        """Poll as soon as possible instead of waiting for the next interval"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        """Poll loop (runs on the poller thread)"""
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+            with self._lock:
+                if not self._subscribers:
+                    # A later subscribe() starts a new thread
+                    self._thread = None
+                    return
+
+            try:
+                self._poll()
+            except Exception as e:
+                logger.error(f"Error polling Homebridge: {e}")
+
+    def _poll(self) -> None:
+        """Fetch all accessories once and dispatch changed states"""
+        accessories = self.client.refresh_accessories()
+        if not accessories:
+            return
+
+        updates = []
+        with self._lock:
+            # Nothing changed on the server and nobody new needs a first state
+            if accessories is self._last_accessories and not self._subscribers_changed:
+                return
+            self._last_accessories = accessories
+            self._subscribers_changed = False
+            
+            for item in accessories:
+                accessory_id = item.get("uniqueId") if isinstance(item, dict) else None
+                if accessory_id not in self._subscribers:
+                    continue
+
+                status = parse_light_status(item)
+                if not status or status == self._states.get(accessory_id):
+                    continue
+
+                self._states[accessory_id] = status
+                updates.extend((callback, status) for callback in self._subscribers[accessory_id])
+
+        # Call back without holding the lock so subscribers may (un)subscribe
+        for callback, status in updates:
+            try:
+                callback(status)
+            except Exception as e:
+                logger.error(f"Error notifying poller subscriber: {e}")